@@ -0,0 +1,118 @@
+# src/batch_scheduler.py
+import asyncio
+import logging
+from typing import List, Tuple
+
+import numpy as np
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+class BatchScheduler:
+    """
+    Dynamic micro-batching scheduler for model inference
+
+    Coalesces concurrent single-image prediction requests into one batched
+    model call. Each request enqueues its preprocessed tensor together with
+    a Future and awaits the result; a background task drains the queue,
+    stacks up to `max_batch_size` tensors (waiting at most `max_wait_ms`
+    for stragglers) and runs a single inference on the whole batch.
+    """
+
+    def __init__(self, model_loader,
+                 max_batch_size: int = settings.BATCH_MAX_SIZE,
+                 max_wait_ms: float = settings.BATCH_MAX_WAIT_MS):
+        """
+        Initialize batch scheduler
+
+        Args:
+            model_loader: ModelLoader instance used to run batched inference
+            max_batch_size: Maximum number of requests per batch
+            max_wait_ms: Maximum time (milliseconds) to wait for additional
+                requests after the first one arrives
+        """
+        self.model_loader = model_loader
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._task = None
+        logger.info(
+            f"BatchScheduler initialized with max_batch_size={max_batch_size}, "
+            f"max_wait_ms={max_wait_ms}"
+        )
+
+    def start(self):
+        """Start the background batching task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("BatchScheduler started")
+
+    async def stop(self):
+        """Stop the background batching task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("BatchScheduler stopped")
+
+    async def predict(self, image: np.ndarray) -> np.ndarray:
+        """
+        Submit a single preprocessed image for batched inference
+
+        Args:
+            image: Preprocessed image array (height, width, channels),
+                without a batch dimension
+
+        Returns:
+            Probability array for the image (one row of the batched output)
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((image, future))
+        return await future
+
+    async def _collect_batch(self) -> List[Tuple[np.ndarray, asyncio.Future]]:
+        """Wait for the first request, then drain up to max_batch_size"""
+        batch = [await self.queue.get()]
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        """Background loop: collect a batch, run inference, resolve futures"""
+        while True:
+            batch = await self._collect_batch()
+
+            try:
+                stacked = np.stack([image for image, _ in batch])
+                # Run the blocking model call in a worker thread so the
+                # scheduler loop (and the rest of the app) stays responsive
+                probs = await asyncio.to_thread(
+                    self.model_loader.predict_on_batch, stacked
+                )
+            except Exception as e:
+                logger.error(f"Error during batched inference: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            logger.debug(f"Ran batched inference on {len(batch)} image(s)")
+
+            for row, (_, future) in zip(probs, batch):
+                if not future.done():
+                    future.set_result(row)
@@ -14,11 +14,21 @@ class Settings(BaseSettings):
     # Server Settings
     HOST: str = "0.0.0.0"
     PORT: int = 8000
-    RELOAD: bool = True
+    # Auto-reload forks a file-watching supervisor; keep it off outside
+    # development (set RELOAD=true in .env to enable)
+    RELOAD: bool = False
+    WORKERS: int = 1
     
     # Model Settings
     MODEL_PATH: str = "src/models/model_1_simple_local.h5"
     IMAGE_SIZE: tuple = (150, 150)
+
+    # Batching Settings
+    BATCH_MAX_SIZE: int = 8
+    BATCH_MAX_WAIT_MS: float = 20.0
+
+    # Prediction cache (entries; 0 disables caching)
+    PREDICTION_CACHE_SIZE: int = 1024
     
     # CORS Settings
     ALLOWED_ORIGINS: List[str] = ["*"]
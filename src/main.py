@@ -2,13 +2,22 @@
 
 from fastapi import FastAPI, File, UploadFile, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
+from collections import OrderedDict
 from contextlib import asynccontextmanager
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import queue
 import uvicorn
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
 from typing import Dict, Any
+import hashlib
 import io
+import os
+import numpy as np
 from PIL import Image
 import time
 from fastapi.staticfiles import StaticFiles
@@ -18,6 +27,7 @@ from fastapi.responses import HTMLResponse
 # Import custom modules
 from src.model_loader import ModelLoader
 from src.preprocessing import ImagePreprocessor
+from src.batch_scheduler import BatchScheduler
 from src.config import settings
 # Configure logging
 logging.basicConfig(
@@ -30,9 +40,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Global variables for model and preprocessor
+# Global variables for model, preprocessor and batch scheduler
 model_loader = None
 preprocessor = None
+batch_scheduler = None
+executor = None
+log_listener = None
+frontend_html = None
+frontend_etag = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -40,24 +55,68 @@ async def lifespan(app: FastAPI):
     Lifespan context manager for FastAPI
     Handles startup and shutdown events
     """
-    # Startup: Load model and preprocessor
-    global model_loader, preprocessor
-    
+    # Startup: Load model, preprocessor and batch scheduler
+    global model_loader, preprocessor, batch_scheduler, executor, log_listener
+    global frontend_html, frontend_etag
+
+    # Move log I/O off the request path: handlers (file + stream) run on
+    # the listener's thread, request threads only enqueue records
+    root_logger = logging.getLogger()
+    log_queue = queue.Queue(-1)
+    log_listener = QueueListener(log_queue, *root_logger.handlers,
+                                 respect_handler_level=True)
+    root_logger.handlers = [QueueHandler(log_queue)]
+    log_listener.start()
+
     logger.info("Starting application...")
     logger.info("Loading model and preprocessor...")
-    
+
     try:
         model_loader = ModelLoader(model_path=settings.MODEL_PATH)
-        preprocessor = ImagePreprocessor(target_size=(150, 150))
+        preprocessor = ImagePreprocessor(
+            target_size=(150, 150),
+            output_dtype=model_loader.input_dtype
+        )
+        batch_scheduler = BatchScheduler(model_loader)
+        batch_scheduler.start()
+
+        # Bounded thread pool for blocking work (image decode, preprocess,
+        # inference) so the event loop never blocks and parallel decodes
+        # are capped at the number of cores
+        executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+        asyncio.get_running_loop().set_default_executor(executor)
+
+        # Cache the landing page once; serving it then costs no disk I/O
+        with open(os.path.join(frontend_dir, "index.html"), "rb") as f:
+            frontend_html = f.read()
+        frontend_etag = f'"{hashlib.md5(frontend_html).hexdigest()}"'
+
         logger.info("Model and preprocessor loaded successfully!")
     except Exception as e:
         logger.error(f"Failed to load model: {e}")
         raise
-    
+
     yield
-    
+
     # Shutdown
     logger.info("Shutting down application...")
+    if batch_scheduler is not None:
+        await batch_scheduler.stop()
+    if executor is not None:
+        executor.shutdown(wait=False)
+    if log_listener is not None:
+        log_listener.stop()
+
+class NumpyORJSONResponse(ORJSONResponse):
+    """
+    orjson response that serializes numpy scalars and arrays natively
+
+    Lets endpoints put probability values in responses directly, without
+    per-item float() casts, and serializes 2-5x faster than stdlib json.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
 
 # Create FastAPI application
 app = FastAPI(
@@ -65,7 +124,8 @@ app = FastAPI(
     description=settings.API_DESCRIPTION,
     version=settings.API_VERSION,
     redoc_url="/redoc",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=NumpyORJSONResponse
 )
 
 # Add CORS middleware
@@ -77,23 +137,37 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Cached response timestamp (datetime.now().isoformat() allocates and
+# formats a string on every call; responses don't need sub-100ms
+# precision, so reuse the formatted string within a small window)
+_timestamp_cache = (0, "")
+
+def current_timestamp() -> str:
+    """ISO-format timestamp for responses, cached in 100ms windows"""
+    global _timestamp_cache
+    key = int(time.time() * 10)
+    if _timestamp_cache[0] != key:
+        _timestamp_cache = (key, datetime.now().isoformat())
+    return _timestamp_cache[1]
+
 # Request logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     """Log all incoming requests"""
-    start_time = time.time()
-    
-    # Log request
-    logger.info(f"Request: {request.method} {request.url.path}")
-    
+    # perf_counter is monotonic and cheaper than time.time for intervals
+    start_time = time.perf_counter()
+
+    # Log request (DEBUG: per-request lines are pure overhead at high RPS)
+    logger.debug(f"Request: {request.method} {request.url.path}")
+
     # Process request
     response = await call_next(request)
-    
+
     # Calculate processing time
-    process_time = time.time() - start_time
-    
+    process_time = time.perf_counter() - start_time
+
     # Log response
-    logger.info(f"Response: {response.status_code} - Time: {process_time:.3f}s")
+    logger.debug(f"Response: {response.status_code} - Time: {process_time:.3f}s")
     
     # Add custom header
     response.headers["X-Process-Time"] = str(process_time)
@@ -104,17 +178,20 @@ async def log_requests(request: Request, call_next):
 # ENDPOINTS
 # ============================================================================
 # Serve frontend static files
-import os
-
 frontend_dir = os.path.join(os.path.dirname(__file__), "frontend")
 
 app.mount("/static", StaticFiles(directory=frontend_dir), name="static")
 
 @app.get("/", response_class=HTMLResponse)
 async def serve_frontend():
-    """Serve the main frontend HTML file."""
-    with open(os.path.join(frontend_dir, "index.html"), "r", encoding="utf-8") as f:
-        return f.read()
+    """Serve the main frontend HTML file from the in-memory cache."""
+    return HTMLResponse(
+        content=frontend_html,
+        headers={
+            "Cache-Control": "public, max-age=3600",
+            "ETag": frontend_etag
+        }
+    )
 
 # @app.get("/", tags=["Root"])
 # async def root():
@@ -140,7 +217,7 @@ async def health_check():
     return {
         "status": "healthy" if model_loaded else "unhealthy",
         "model_loaded": model_loaded,
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": current_timestamp(),
         "classes": model_loader.get_classes() if model_loaded else []
     }
 
@@ -169,33 +246,51 @@ async def predict_image(file: UploadFile = File(...)):
             detail=f"Invalid file type: {file.content_type}. Only JPEG and PNG are supported."
         )
     
+    # Read image file with size cap and magic-byte validation
+    contents = await read_image_upload(file)
+
     try:
-        # Read image file
-        contents = await file.read()
-        image = Image.open(io.BytesIO(contents))
-        
-        # Log image info
-        logger.info(f"Processing image: {file.filename} - Size: {image.size}, Mode: {image.mode}")
-        
-        # Preprocess image
-        processed_image = preprocessor.preprocess(image)
-        
-        # Get predictions
-        predictions = model_loader.predict(processed_image)
-        
-        # Get top class
-        top_class = max(predictions.items(), key=lambda x: x[1])
-        
+        # Identical content gets the cached prediction - no decode,
+        # no inference (blake2b has SIMD-accelerated implementations)
+        cache_key = hashlib.blake2b(contents, digest_size=16).digest()
+        probs = _cache_lookup(cache_key)
+
+        if probs is None:
+            # Decode and preprocess off the event loop so concurrent
+            # requests aren't serialized behind blocking CPU work
+            image = await asyncio.to_thread(Image.open, io.BytesIO(contents))
+
+            # Log image info
+            logger.info(f"Processing image: {file.filename} - Size: {image.size}, Mode: {image.mode}")
+
+            # Preprocess image (un-batched; the scheduler stacks the batch)
+            processed_image = await asyncio.to_thread(
+                preprocessor.preprocess, image, add_batch_dim=False
+            )
+
+            # Get predictions through the micro-batching scheduler
+            probs = await batch_scheduler.predict(processed_image)
+            _cache_store(cache_key, probs)
+        else:
+            logger.debug(f"Prediction cache hit for {file.filename}")
+
+        # Top class straight from the probability array - no sort,
+        # no intermediate dict. tolist() converts all six values to
+        # native floats in one pass.
+        classes = model_loader.get_classes()
+        top_idx = int(probs.argmax())
+        values = probs.tolist()
+
         # Log prediction
-        logger.info(f"Prediction: {top_class[0]} with confidence {top_class[1]:.4f}")
-        
+        logger.info(f"Prediction: {classes[top_idx]} with confidence {values[top_idx]:.4f}")
+
         # Prepare response
         response = {
             "filename": file.filename,
-            "class": top_class[0],
-            "confidence": float(top_class[1]),
-            "predictions": {k: float(v) for k, v in predictions.items()},
-            "timestamp": datetime.now().isoformat()
+            "class": classes[top_idx],
+            "confidence": values[top_idx],
+            "predictions": dict(zip(classes, values)),
+            "timestamp": current_timestamp()
         }
         
         return response
@@ -203,10 +298,82 @@ async def predict_image(file: UploadFile = File(...)):
     except Exception as e:
         logger.error(f"Error processing image: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
-    
+
+def _decode_and_preprocess(contents: bytes) -> np.ndarray:
+    """Decode image bytes and preprocess to an un-batched tensor"""
+    image = Image.open(io.BytesIO(contents))
+    return preprocessor.preprocess(image, add_batch_dim=False)
+
+# Bounded LRU cache of content hash -> probability array. Repeated
+# uploads of the same image (client retries, duplicated batch items,
+# popular assets) skip decode, preprocessing and inference entirely.
+# Only touched from the event loop, so no locking is needed.
+_prediction_cache: OrderedDict = OrderedDict()
+
+def _cache_lookup(key: bytes):
+    """Return cached probabilities for a content hash, or None"""
+    probs = _prediction_cache.get(key)
+    if probs is not None:
+        _prediction_cache.move_to_end(key)
+    return probs
+
+def _cache_store(key: bytes, probs):
+    """Store probabilities for a content hash, evicting the oldest entry"""
+    if settings.PREDICTION_CACHE_SIZE <= 0:
+        return
+    _prediction_cache[key] = probs
+    if len(_prediction_cache) > settings.PREDICTION_CACHE_SIZE:
+        _prediction_cache.popitem(last=False)
+
+# Magic bytes of the supported formats; checked before any decode work
+JPEG_MAGIC = b'\xff\xd8\xff'
+PNG_MAGIC = b'\x89PNG\r\n\x1a\n'
+
+async def read_image_upload(file: UploadFile) -> bytes:
+    """
+    Read an uploaded image with a streaming size cap and content check
+
+    Enforces settings.MAX_FILE_SIZE while reading, so an oversized upload
+    is rejected as soon as the cap is crossed instead of being buffered
+    whole, and rejects payloads whose magic bytes are not JPEG/PNG before
+    paying any decode cost.
+
+    Args:
+        file: Uploaded file
+
+    Returns:
+        The file contents
+
+    Raises:
+        HTTPException: 413 if the file exceeds MAX_FILE_SIZE,
+            400 if the content is not a JPEG or PNG image
+    """
+    buf = bytearray()
+    try:
+        while True:
+            chunk = await file.read(64 * 1024)
+            if not chunk:
+                break
+            buf += chunk
+            if len(buf) > settings.MAX_FILE_SIZE:
+                logger.warning(f"Upload too large: {file.filename}")
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File too large. Maximum size is {settings.MAX_FILE_SIZE} bytes."
+                )
     finally:
         await file.close()
 
+    contents = bytes(buf)
+    if not (contents.startswith(JPEG_MAGIC) or contents.startswith(PNG_MAGIC)):
+        logger.warning(f"Upload is not a JPEG/PNG image: {file.filename}")
+        raise HTTPException(
+            status_code=400,
+            detail="File content is not a valid JPEG or PNG image."
+        )
+
+    return contents
+
 @app.post("/predict-batch", tags=["Prediction"])
 async def predict_batch(files: list[UploadFile] = File(...)):
     """
@@ -224,48 +391,87 @@ async def predict_batch(files: list[UploadFile] = File(...)):
     
     if len(files) > 10:
         raise HTTPException(status_code=400, detail="Maximum 10 images per batch")
-    
-    results = []
-    
-    for file in files:
-        try:
-            # Validate file type
-            if not file.content_type in ["image/jpeg", "image/jpg", "image/png"]:
-                results.append({
-                    "filename": file.filename,
-                    "error": f"Invalid file type: {file.content_type}"
-                })
-                continue
-            
-            # Read and process image
-            contents = await file.read()
-            image = Image.open(io.BytesIO(contents))
-            processed_image = preprocessor.preprocess(image)
-            
-            # Get predictions
-            predictions = model_loader.predict(processed_image)
-            top_class = max(predictions.items(), key=lambda x: x[1])
-            
-            results.append({
-                "filename": file.filename,
-                "class": top_class[0],
-                "confidence": float(top_class[1]),
-                "predictions": {k: float(v) for k, v in predictions.items()}
-            })
-            
-        except Exception as e:
-            results.append({
+
+    results = [None] * len(files)
+
+    # Validate file types up front
+    pending = []
+    for i, file in enumerate(files):
+        if not file.content_type in ["image/jpeg", "image/jpg", "image/png"]:
+            results[i] = {
                 "filename": file.filename,
-                "error": str(e)
-            })
-        
-        finally:
+                "error": f"Invalid file type: {file.content_type}"
+            }
             await file.close()
-    
+        else:
+            pending.append(i)
+
+    # Read all uploads concurrently (with size cap and magic-byte check),
+    # then decode + preprocess them in parallel on the thread pool
+    contents = await asyncio.gather(
+        *[read_image_upload(files[i]) for i in pending],
+        return_exceptions=True
+    )
+
+    readable = []
+    for i, data in zip(pending, contents):
+        if isinstance(data, HTTPException):
+            results[i] = {
+                "filename": files[i].filename,
+                "error": data.detail
+            }
+        elif isinstance(data, Exception):
+            results[i] = {
+                "filename": files[i].filename,
+                "error": str(data)
+            }
+        else:
+            readable.append((i, data))
+
+    tensors = await asyncio.gather(
+        *[asyncio.to_thread(_decode_and_preprocess, data) for _, data in readable],
+        return_exceptions=True
+    )
+
+    ok = []
+    for (i, _), tensor in zip(readable, tensors):
+        if isinstance(tensor, Exception):
+            results[i] = {
+                "filename": files[i].filename,
+                "error": str(tensor)
+            }
+        else:
+            ok.append((i, tensor))
+
+    # Stack everything into one tensor and run a single batched inference
+    # instead of one graph invocation per image
+    if ok:
+        try:
+            batch = np.stack([tensor for _, tensor in ok])
+            probs = await asyncio.to_thread(model_loader.predict_on_batch, batch)
+        except Exception as e:
+            logger.error(f"Error during batch prediction: {e}")
+            for i, _ in ok:
+                results[i] = {
+                    "filename": files[i].filename,
+                    "error": str(e)
+                }
+        else:
+            classes = model_loader.get_classes()
+            for (i, _), row in zip(ok, probs):
+                top_idx = int(row.argmax())
+                values = row.tolist()
+                results[i] = {
+                    "filename": files[i].filename,
+                    "class": classes[top_idx],
+                    "confidence": values[top_idx],
+                    "predictions": dict(zip(classes, values))
+                }
+
     return {
         "total": len(results),
         "results": results,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": current_timestamp()
     }
 
 @app.get("/classes", tags=["Information"])
@@ -292,7 +498,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         content={
             "error": exc.detail,
             "status_code": exc.status_code,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": current_timestamp()
         }
     )
 
@@ -305,7 +511,7 @@ async def general_exception_handler(request: Request, exc: Exception):
         content={
             "error": "Internal server error",
             "message": str(exc),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": current_timestamp()
         }
     )
 
@@ -319,5 +525,10 @@ if __name__ == "__main__":
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.RELOAD,
+        workers=settings.WORKERS,
+        # libuv event loop and C HTTP parser (both ship with
+        # uvicorn[standard]) cut per-request framework overhead
+        loop="uvloop",
+        http="httptools",
         log_level="info"
     )